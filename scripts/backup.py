@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Incremental, deduplicating backup of exported files, logs and config.
+
+File contents are split into chunks stored once under their SHA-256 hash, and
+every snapshot is a small JSON manifest listing the chunks of each file. Files
+whose size and modification time match the previous snapshot are not read
+again, so unchanged exports cost nothing on later runs.
+
+Usage:
+    python scripts/backup.py backup [PATH ...]
+    python scripts/backup.py list
+    python scripts/backup.py ls [SNAPSHOT]
+    python scripts/backup.py restore SNAPSHOT [FILE ...] [--target DIR]
+    python scripts/backup.py prune [--keep N]
+"""
+
+import os
+import sys
+import json
+import zlib
+import hashlib
+import argparse
+from datetime import datetime
+
+# Default locations, relative to the project root
+DEFAULT_STORE = os.path.join('backups', 'store')
+DEFAULT_SOURCES = ['exports', 'logs', '.env']
+
+# Files are split into fixed-size chunks so appended logs only add new chunks
+CHUNK_SIZE = 1024 * 1024
+
+EXCLUDED_DIRS = {'backups', '.git', '__pycache__'}
+EXCLUDED_SUFFIXES = ('.pyc',)
+
+
+class BackupError(Exception):
+    """Raised when a snapshot or chunk cannot be found or is corrupt."""
+
+
+def _chunks_dir(store):
+    return os.path.join(store, 'chunks')
+
+
+def _snapshots_dir(store):
+    return os.path.join(store, 'snapshots')
+
+
+def _chunk_path(store, digest):
+    return os.path.join(_chunks_dir(store), digest[:2], digest)
+
+
+def _atomic_write(path, data):
+    """Write data to path via a temporary file so readers never see partial files."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _is_safe_key(key):
+    """Return True if a manifest key stays inside the directory it is restored to."""
+    parts = key.split('/')
+    return bool(key) and not key.startswith('/') and not os.path.isabs(key) and '..' not in parts
+
+
+def iter_source_files(sources):
+    """Yield relative paths of all regular files under the given sources."""
+    for source in sources:
+        if not os.path.exists(source):
+            print(f"Warning: skipping {source}: no such file or directory", file=sys.stderr)
+            continue
+        if os.path.isfile(source):
+            yield os.path.normpath(source)
+            continue
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDED_DIRS)
+            for filename in sorted(filenames):
+                if filename.endswith(EXCLUDED_SUFFIXES):
+                    continue
+                yield os.path.normpath(os.path.join(dirpath, filename))
+
+
+def store_file(store, path):
+    """Store the contents of path as chunks and return their hashes and new bytes written."""
+    digests = []
+    written = 0
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if not data:
+                break
+            digest = hashlib.sha256(data).hexdigest()
+            chunk_path = _chunk_path(store, digest)
+            if not os.path.exists(chunk_path):
+                compressed = zlib.compress(data)
+                _atomic_write(chunk_path, compressed)
+                written += len(compressed)
+            digests.append(digest)
+    return digests, written
+
+
+def read_chunk(store, digest):
+    """Return the verified contents of a stored chunk."""
+    try:
+        with open(_chunk_path(store, digest), 'rb') as f:
+            data = zlib.decompress(f.read())
+    except (OSError, zlib.error) as e:
+        raise BackupError(f"Cannot read chunk {digest}: {e}")
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise BackupError(f"Chunk {digest} is corrupt")
+    return data
+
+
+def list_snapshots(store=DEFAULT_STORE):
+    """Return snapshot ids, oldest first."""
+    try:
+        names = os.listdir(_snapshots_dir(store))
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-len('.json')] for name in names if name.endswith('.json'))
+
+
+def load_manifest(store, snapshot_id):
+    """Load a snapshot manifest; 'latest' selects the newest snapshot."""
+    if snapshot_id == 'latest':
+        snapshots = list_snapshots(store)
+        if not snapshots:
+            raise BackupError("No snapshots found")
+        snapshot_id = snapshots[-1]
+    path = os.path.join(_snapshots_dir(store), f"{snapshot_id}.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise BackupError(f"Snapshot not found: {snapshot_id}")
+
+
+def create_snapshot(sources=DEFAULT_SOURCES, store=DEFAULT_STORE):
+    """Back up sources into a new snapshot and return its manifest."""
+    snapshots = list_snapshots(store)
+    previous = load_manifest(store, snapshots[-1])['files'] if snapshots else {}
+
+    files = {}
+    stats = {'files': 0, 'reused': 0, 'bytes_written': 0}
+    for path in iter_source_files(sources):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        key = path.replace(os.sep, '/')
+        if not _is_safe_key(key):
+            print(f"Warning: skipping {path}: only paths inside the project can be backed up", file=sys.stderr)
+            continue
+        entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'mode': st.st_mode & 0o777}
+
+        old = previous.get(key)
+        if old and old['size'] == entry['size'] and old['mtime_ns'] == entry['mtime_ns']:
+            entry['chunks'] = old['chunks']
+            stats['reused'] += 1
+        else:
+            try:
+                entry['chunks'], written = store_file(store, path)
+            except OSError as e:
+                # Rotated, deleted or unreadable since it was listed
+                print(f"Warning: skipping {path}: {e}", file=sys.stderr)
+                continue
+            stats['bytes_written'] += written
+
+        files[key] = entry
+        stats['files'] += 1
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    snapshot_id = timestamp
+    suffix = 1
+    while snapshot_id in snapshots:
+        snapshot_id = f"{timestamp}_{suffix}"
+        suffix += 1
+
+    manifest = {
+        'id': snapshot_id,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'stats': stats,
+        'files': files,
+    }
+    manifest_path = os.path.join(_snapshots_dir(store), f"{snapshot_id}.json")
+    _atomic_write(manifest_path, json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+def restore_snapshot(snapshot_id, paths=None, target='.', store=DEFAULT_STORE):
+    """Restore all files of a snapshot, or only the given paths, under target."""
+    files = load_manifest(store, snapshot_id)['files']
+    if paths:
+        wanted = [os.path.normpath(p).replace(os.sep, '/') for p in paths]
+        missing = [p for p in wanted if p not in files]
+        if missing:
+            raise BackupError(f"Not in snapshot: {', '.join(missing)}")
+    else:
+        wanted = sorted(files)
+
+    unsafe = [key for key in wanted if not _is_safe_key(key)]
+    if unsafe:
+        raise BackupError(f"Refusing to restore outside the target: {', '.join(unsafe)}")
+
+    restored = []
+    for key in wanted:
+        entry = files[key]
+        dest = os.path.join(target, *key.split('/'))
+        data = b''.join(read_chunk(store, digest) for digest in entry['chunks'])
+        _atomic_write(dest, data)
+        os.chmod(dest, entry['mode'])
+        os.utime(dest, ns=(entry['mtime_ns'], entry['mtime_ns']))
+        restored.append(dest)
+    return restored
+
+
+def prune_snapshots(keep=7, store=DEFAULT_STORE):
+    """Delete all but the newest keep snapshots and any chunks no longer referenced."""
+    snapshots = list_snapshots(store)
+    removed = snapshots[:-keep] if keep > 0 else snapshots
+    for snapshot_id in removed:
+        os.remove(os.path.join(_snapshots_dir(store), f"{snapshot_id}.json"))
+
+    referenced = set()
+    for snapshot_id in list_snapshots(store):
+        for entry in load_manifest(store, snapshot_id)['files'].values():
+            referenced.update(entry['chunks'])
+
+    freed = 0
+    chunks_dir = _chunks_dir(store)
+    if os.path.isdir(chunks_dir):
+        for prefix in os.listdir(chunks_dir):
+            prefix_dir = os.path.join(chunks_dir, prefix)
+            for digest in os.listdir(prefix_dir):
+                if digest not in referenced:
+                    chunk_path = os.path.join(prefix_dir, digest)
+                    freed += os.path.getsize(chunk_path)
+                    os.remove(chunk_path)
+    return removed, freed
+
+
+def _format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental backup of exports, logs and config")
+    parser.add_argument('--store', default=DEFAULT_STORE, help="backup store directory")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    backup_parser = subparsers.add_parser('backup', help="create a new snapshot")
+    backup_parser.add_argument('paths', nargs='*', default=DEFAULT_SOURCES)
+
+    subparsers.add_parser('list', help="list snapshots")
+
+    ls_parser = subparsers.add_parser('ls', help="list files in a snapshot")
+    ls_parser.add_argument('snapshot', nargs='?', default='latest')
+
+    restore_parser = subparsers.add_parser('restore', help="restore a snapshot or single files")
+    restore_parser.add_argument('snapshot')
+    restore_parser.add_argument('files', nargs='*')
+    restore_parser.add_argument('--target', default='.', help="directory to restore into")
+
+    prune_parser = subparsers.add_parser('prune', help="remove old snapshots and unused chunks")
+    prune_parser.add_argument('--keep', type=int, default=7)
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'backup':
+            manifest = create_snapshot(args.paths, args.store)
+            stats = manifest['stats']
+            print(f"Snapshot {manifest['id']}: {stats['files']} files "
+                  f"({stats['reused']} unchanged), {_format_size(stats['bytes_written'])} new data")
+        elif args.command == 'list':
+            for snapshot_id in list_snapshots(args.store):
+                print(snapshot_id)
+        elif args.command == 'ls':
+            for path, entry in sorted(load_manifest(args.store, args.snapshot)['files'].items()):
+                print(f"{_format_size(entry['size']):>8}  {path}")
+        elif args.command == 'restore':
+            for path in restore_snapshot(args.snapshot, args.files, args.target, args.store):
+                print(f"Restored {path}")
+        elif args.command == 'prune':
+            removed, freed = prune_snapshots(args.keep, args.store)
+            print(f"Removed {len(removed)} snapshot(s), freed {_format_size(freed)}")
+    except BackupError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,8 +7,6 @@ set -e
 
 # Configuration
 BACKUP_DIR="backups"
-TIMESTAMP=$(date +"%Y%m%d_%H%M%S")
-BACKUP_NAME="discord_bot_backup_${TIMESTAMP}"
 
 # Colors for output
 GREEN='\033[0;32m'
@@ -28,31 +26,27 @@ mkdir -p "${BACKUP_DIR}"
 
 print_status "Starting backup process..."
 
-# Create backup archive
-BACKUP_PATH="${BACKUP_DIR}/${BACKUP_NAME}.tar.gz"
+# Create an incremental snapshot of exported files, logs, and config.
+# Unchanged files are deduplicated against earlier snapshots.
+print_status "Creating snapshot in ${BACKUP_DIR}/store"
 
-print_status "Creating backup archive: ${BACKUP_PATH}"
+python3 scripts/backup.py --store "${BACKUP_DIR}/store" backup exports logs .env
 
-# Create tar archive with exported files, logs, and config
-tar -czf "${BACKUP_PATH}" \
-    --exclude="backups" \
-    --exclude=".git" \
-    --exclude="__pycache__" \
-    --exclude="*.pyc" \
-    exports/ \
-    logs/ \
-    .env 2>/dev/null || true
+# Get backup store size
+BACKUP_SIZE=$(du -sh "${BACKUP_DIR}/store" | cut -f1)
+print_status "Backup store size: ${BACKUP_SIZE}"
 
-print_success "Backup created: ${BACKUP_PATH}"
+# Cleanup old snapshots (keep last 7)
+print_status "Cleaning up old snapshots (keeping last 7)..."
+python3 scripts/backup.py --store "${BACKUP_DIR}/store" prune --keep 7
 
-# Get backup size
-BACKUP_SIZE=$(du -h "${BACKUP_PATH}" | cut -f1)
-print_status "Backup size: ${BACKUP_SIZE}"
-
-# Cleanup old backups (keep last 7)
-print_status "Cleaning up old backups (keeping last 7)..."
-cd "${BACKUP_DIR}"
-ls -t discord_bot_backup_*.tar.gz 2>/dev/null | tail -n +8 | xargs rm -f
+# Tarballs from the old backup format are no longer rotated; point them out
+LEGACY_COUNT=$(ls "${BACKUP_DIR}"/discord_bot_backup_*.tar.gz 2>/dev/null | wc -l)
+if [ "${LEGACY_COUNT}" -gt 0 ]; then
+    print_status "Found ${LEGACY_COUNT} old tarball backup(s) in ${BACKUP_DIR}/ (discord_bot_backup_*.tar.gz)."
+    print_status "They are not managed by this script; delete them once they are no longer needed."
+fi
 
 print_success "Backup process completed!"
-print_status "Backup location: $(pwd)/${BACKUP_NAME}.tar.gz"
\ No newline at end of file
+print_status "List snapshots: python3 scripts/backup.py list"
+print_status "Restore a file: python3 scripts/backup.py restore latest exports/<file>"
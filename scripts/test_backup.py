@@ -0,0 +1,135 @@
+import os
+import json
+import pytest
+import backup
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Create a project tree with exports and logs and chdir into it."""
+    (tmp_path / "exports").mkdir()
+    (tmp_path / "exports" / "channel_logs_general.txt").write_text("hello\n")
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "logs" / "bot.log").write_text("started\n")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_backup_and_restore_roundtrip(workspace, tmp_path_factory):
+    """Test that a snapshot restores files with identical contents."""
+    manifest = backup.create_snapshot(["exports", "logs"], "store")
+    assert set(manifest["files"]) == {"exports/channel_logs_general.txt", "logs/bot.log"}
+
+    target = tmp_path_factory.mktemp("restore")
+    backup.restore_snapshot("latest", target=str(target), store="store")
+    assert (target / "exports" / "channel_logs_general.txt").read_text() == "hello\n"
+    assert (target / "logs" / "bot.log").read_text() == "started\n"
+
+
+def test_unchanged_files_are_not_stored_again(workspace):
+    """Test that a second snapshot reuses unchanged files and writes no new data."""
+    backup.create_snapshot(["exports", "logs"], "store")
+    manifest = backup.create_snapshot(["exports", "logs"], "store")
+
+    assert manifest["stats"]["reused"] == 2
+    assert manifest["stats"]["bytes_written"] == 0
+    assert len(backup.list_snapshots("store")) == 2
+
+
+def test_identical_contents_share_chunks(workspace):
+    """Test that files with the same contents are stored once."""
+    (workspace / "exports" / "copy.txt").write_text("hello\n")
+    manifest = backup.create_snapshot(["exports"], "store")
+
+    files = manifest["files"]
+    assert files["exports/copy.txt"]["chunks"] == files["exports/channel_logs_general.txt"]["chunks"]
+
+
+def test_restore_single_file(workspace, tmp_path_factory):
+    """Test restoring only one file from a snapshot."""
+    backup.create_snapshot(["exports", "logs"], "store")
+    target = tmp_path_factory.mktemp("restore")
+
+    restored = backup.restore_snapshot("latest", ["logs/bot.log"], str(target), "store")
+
+    assert restored == [os.path.join(str(target), "logs", "bot.log")]
+    assert not (target / "exports").exists()
+
+
+def test_restore_accepts_unnormalized_paths(workspace, tmp_path_factory):
+    """Test that './exports/...' style paths match snapshot entries."""
+    backup.create_snapshot(["exports"], "store")
+    target = tmp_path_factory.mktemp("restore")
+
+    backup.restore_snapshot("latest", ["./exports/channel_logs_general.txt"], str(target), "store")
+
+    assert (target / "exports" / "channel_logs_general.txt").read_text() == "hello\n"
+
+
+def test_unreadable_file_is_skipped(workspace, monkeypatch):
+    """Test that a file that cannot be read is skipped instead of aborting the backup."""
+    real_store_file = backup.store_file
+
+    def failing_store_file(store, path):
+        if path.endswith("bot.log"):
+            raise PermissionError(13, "Permission denied")
+        return real_store_file(store, path)
+
+    monkeypatch.setattr(backup, "store_file", failing_store_file)
+    manifest = backup.create_snapshot(["exports", "logs"], "store")
+
+    assert set(manifest["files"]) == {"exports/channel_logs_general.txt"}
+
+
+def test_missing_source_is_reported(workspace, capsys):
+    """Test that a mistyped source path prints a warning."""
+    manifest = backup.create_snapshot(["exprts"], "store")
+
+    assert manifest["files"] == {}
+    assert "exprts" in capsys.readouterr().err
+
+
+def test_paths_outside_project_are_not_backed_up(workspace, capsys):
+    """Test that sources above the working directory are skipped."""
+    (workspace / "exports" / "nested").mkdir()
+    os.chdir(workspace / "exports" / "nested")
+    manifest = backup.create_snapshot(["../channel_logs_general.txt"], "store")
+
+    assert manifest["files"] == {}
+    assert "inside the project" in capsys.readouterr().err
+
+
+def test_restore_rejects_keys_escaping_target(workspace, tmp_path_factory):
+    """Test that a manifest key with '..' is never written outside the target."""
+    manifest = backup.create_snapshot(["exports"], "store")
+    entry = manifest["files"].pop("exports/channel_logs_general.txt")
+    manifest["files"]["../escaped.txt"] = entry
+    path = os.path.join("store", "snapshots", f"{manifest['id']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    target = tmp_path_factory.mktemp("restore")
+
+    with pytest.raises(backup.BackupError):
+        backup.restore_snapshot("latest", target=str(target), store="store")
+    assert not (target.parent / "escaped.txt").exists()
+
+
+def test_restore_missing_snapshot_raises(workspace):
+    """Test that restoring an unknown snapshot raises BackupError."""
+    with pytest.raises(backup.BackupError):
+        backup.restore_snapshot("19700101_000000", store="store")
+
+
+def test_prune_removes_unreferenced_chunks(workspace):
+    """Test that pruning old snapshots deletes chunks only they used."""
+    backup.create_snapshot(["exports"], "store")
+    (workspace / "exports" / "channel_logs_general.txt").write_text("changed\n")
+    os.utime(workspace / "exports" / "channel_logs_general.txt", ns=(1, 1))
+    backup.create_snapshot(["exports"], "store")
+
+    removed, freed = backup.prune_snapshots(keep=1, store="store")
+
+    assert len(removed) == 1
+    assert freed > 0
+    backup.restore_snapshot("latest", target="out", store="store")
+    assert (workspace / "out" / "exports" / "channel_logs_general.txt").read_text() == "changed\n"
@@ -0,0 +1,202 @@
+import os
+import time
+import signal
+import threading
+import subprocess
+import pytest
+from watchdog.events import FileDeletedEvent, FileMovedEvent
+from watch_and_test import AutoTestRunner, WarmWorker, affected_tests, module_names
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Create a small project tree with a module and two test files."""
+    (tmp_path / "bot").mkdir()
+    (tmp_path / "bot" / "main.py").write_text("VALUE = 1\n")
+    (tmp_path / "bot" / "test_commands.py").write_text(
+        "def test_value():\n    from main import VALUE\n    assert VALUE == 1\n"
+    )
+    (tmp_path / "test_other.py").write_text("def test_nothing():\n    pass\n")
+    (tmp_path / "helper.py").write_text("\n")
+    return tmp_path
+
+
+def test_module_names():
+    """Test that a module maps to its dotted and bare import names."""
+    assert module_names(os.path.join("bot", "main.py")) == {"bot.main", "main"}
+
+
+def test_changed_module_selects_importing_tests(project):
+    """Test that changing a module only selects tests importing it."""
+    changed = [str(project / "bot" / "main.py")]
+    assert affected_tests(changed, str(project)) == [os.path.join("bot", "test_commands.py")]
+
+
+def test_changed_test_file_selects_itself(project):
+    """Test that changing a test file only runs that file."""
+    changed = [str(project / "test_other.py")]
+    assert affected_tests(changed, str(project)) == ["test_other.py"]
+
+
+def test_unmapped_module_runs_full_suite(project):
+    """Test that a module no test imports falls back to the full suite."""
+    changed = [str(project / "helper.py")]
+    assert affected_tests(changed, str(project)) is None
+
+
+def test_events_are_coalesced(project):
+    """Test that a burst of events results in a single test run."""
+    runner = AutoTestRunner(root=str(project), debounce=60, use_worker=False)
+    runs = []
+    runner._run_pytest = lambda test_files: runs.append(test_files) or True
+
+    runner.queue_change(str(project / "test_other.py"))
+    runner.queue_change(str(project / "test_other.py"))
+    runner.queue_change(str(project / "bot" / "main.py"))
+    runner.flush()
+
+    assert runs == [[os.path.join("bot", "test_commands.py"), "test_other.py"]]
+    assert runner.timer is None
+
+
+def test_changes_during_a_run_stay_pending(project):
+    """Test that a flush during a run keeps the changes for the next run."""
+    runner = AutoTestRunner(root=str(project), debounce=60, use_worker=False)
+    runs = []
+    runner._run_pytest = lambda test_files: runs.append(test_files) or True
+
+    with runner.run_lock:
+        runner.queue_change(str(project / "test_other.py"))
+        assert runner.flush() is None
+    assert runs == []
+    assert runner.pending == {str(project / "test_other.py")}
+
+    runner.flush()
+    assert runs == [["test_other.py"]]
+    runner.stop()
+
+
+def test_deleted_and_moved_modules_are_queued(project):
+    """Test that deleting or renaming a module queues the old path."""
+    runner = AutoTestRunner(root=str(project), debounce=60, use_worker=False)
+    deleted = str(project / "helper.py")
+    moved_from = str(project / "bot" / "main.py")
+    moved_to = str(project / "bot" / "core.py")
+
+    runner.on_deleted(FileDeletedEvent(deleted))
+    runner.on_moved(FileMovedEvent(moved_from, moved_to))
+    runner.stop()
+
+    assert runner.pending == {deleted, moved_from, moved_to}
+
+
+def test_use_worker_false_disables_worker(project):
+    """Test that the warm worker can be turned off."""
+    assert AutoTestRunner(root=str(project), use_worker=False).worker is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="warm worker requires fork")
+def test_warm_worker_reports_exit_codes(tmp_path):
+    """Test that the warm worker runs pytest and returns its exit code."""
+    (tmp_path / "test_pass.py").write_text("def test_ok():\n    pass\n")
+    (tmp_path / "test_fail.py").write_text("def test_bad():\n    assert False\n")
+    worker = WarmWorker(str(tmp_path))
+    try:
+        assert worker.run(["-q", "-p", "no:cacheprovider", "test_pass.py"]) == 0
+        assert worker.run(["-q", "-p", "no:cacheprovider", "test_fail.py"]) == 1
+    finally:
+        worker.stop()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="warm worker requires fork")
+def test_warm_worker_timeout_kills_run(tmp_path):
+    """Test that a timed-out run is killed instead of left running."""
+    marker = tmp_path / "finished"
+    (tmp_path / "test_slow.py").write_text(
+        "import time\n"
+        "def test_slow():\n"
+        "    time.sleep(3)\n"
+        f"    open({str(marker)!r}, 'w').close()\n"
+    )
+    worker = WarmWorker(str(tmp_path))
+    try:
+        with pytest.raises(subprocess.TimeoutExpired):
+            worker.run(["-q", "-p", "no:cacheprovider", "test_slow.py"], timeout=1)
+        assert worker.process is None
+        time.sleep(3.5)
+        assert not marker.exists()
+    finally:
+        worker.stop()
+
+
+def test_indirect_importers_are_selected(tmp_path):
+    """Test that tests importing a module through another module are selected."""
+    (tmp_path / "helper.py").write_text("X = 1\n")
+    (tmp_path / "app.py").write_text("from helper import X\n")
+    (tmp_path / "test_helper.py").write_text("import helper\n")
+    (tmp_path / "test_app.py").write_text("import app\n")
+
+    changed = [str(tmp_path / "helper.py")]
+    assert affected_tests(changed, str(tmp_path)) == ["test_app.py", "test_helper.py"]
+
+
+def test_all_import_forms_are_selected(tmp_path):
+    """Test that from-imports, comma lists and relative imports select tests."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "helper.py").write_text("X = 1\n")
+    (tmp_path / "pkg" / "app.py").write_text("from . import helper\n")
+    (tmp_path / "test_a.py").write_text("from pkg import helper\n")
+    (tmp_path / "test_b.py").write_text("import pkg.helper\n")
+    (tmp_path / "test_c.py").write_text("import os, helper\n")
+    (tmp_path / "test_d.py").write_text("from pkg.app import helper\n")
+
+    changed = [str(tmp_path / "pkg" / "helper.py")]
+    assert affected_tests(changed, str(tmp_path)) == ["test_a.py", "test_b.py", "test_c.py", "test_d.py"]
+
+
+def test_unresolvable_import_runs_full_suite(tmp_path):
+    """Test that a relative import outside the project falls back to the full suite."""
+    (tmp_path / "helper.py").write_text("from .. import other\n")
+    (tmp_path / "test_helper.py").write_text("import helper\n")
+
+    assert affected_tests([str(tmp_path / "helper.py")], str(tmp_path)) is None
+
+
+def test_module_reaching_conftest_runs_full_suite(tmp_path):
+    """Test that a module used by a conftest falls back to the full suite."""
+    (tmp_path / "helper.py").write_text("X = 1\n")
+    (tmp_path / "conftest.py").write_text("from helper import X\n")
+    (tmp_path / "test_helper.py").write_text("import helper\n")
+    (tmp_path / "test_other.py").write_text("def test_uses_fixture():\n    pass\n")
+
+    assert affected_tests([str(tmp_path / "helper.py")], str(tmp_path)) is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="warm worker requires fork")
+def test_warm_worker_ignores_sigint(tmp_path):
+    """Test that Ctrl+C sent to the terminal's process group leaves the idle worker running."""
+    (tmp_path / "test_pass.py").write_text("def test_ok():\n    pass\n")
+    worker = WarmWorker(str(tmp_path))
+    try:
+        assert worker.run(["-q", "-p", "no:cacheprovider", "test_pass.py"]) == 0
+        os.kill(worker.process.pid, signal.SIGINT)
+        time.sleep(0.2)
+        assert worker.process.is_alive()
+    finally:
+        worker.stop()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="warm worker requires fork")
+def test_warm_worker_death_is_cleaned_up(tmp_path):
+    """Test that a worker dying mid-run raises and leaves no stale process or pipe."""
+    (tmp_path / "test_slow.py").write_text("import time\ndef test_slow():\n    time.sleep(3)\n")
+    worker = WarmWorker(str(tmp_path))
+    threading.Timer(1, lambda: worker.process.kill()).start()
+    try:
+        with pytest.raises(RuntimeError):
+            worker.run(["-q", "-p", "no:cacheprovider", "test_slow.py"])
+        assert worker.process is None
+        assert worker.conn is None
+    finally:
+        worker.stop()
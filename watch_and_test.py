@@ -2,42 +2,340 @@
 """
 Standalone file watcher that runs pytest automatically when Python files change.
 This can be used independently of the Discord bot for development.
+
+Bursts of file events are coalesced into a single run, only the test files
+affected by the changed modules are executed, and tests run in a warm worker
+process that already has pytest and discord.py imported.
 """
 
 import os
+import ast
+import sys
 import time
+import signal
+import threading
 import subprocess
+import multiprocessing
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+# Seconds of quiet to wait after the last event before running tests
+DEBOUNCE_SECONDS = 0.3
+
+# Third-party modules preloaded by the warm worker
+WARM_IMPORTS = ('pytest', 'pytest_asyncio', 'discord', 'discord.ext.commands', 'dotenv', 'watchdog.observers')
+
+# Directories never scanned for tests or watched for changes
+IGNORED_DIRS = {'.git', '__pycache__', '.pytest_cache', 'exports', 'logs', 'backups', 'venv', '.venv'}
+
+# Changes to these files can affect every test
+GLOBAL_FILES = {'conftest.py', 'pytest.ini', 'setup.cfg', 'pyproject.toml', 'requirements.txt'}
+
+
+def is_test_file(path):
+    """Return True if the path looks like a pytest test module."""
+    name = os.path.basename(path)
+    return name.startswith('test_') and name.endswith('.py')
+
+
+def find_python_files(root='.'):
+    """Return all Python file paths under root, relative to root."""
+    python_files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+        for filename in filenames:
+            if filename.endswith('.py'):
+                python_files.append(os.path.relpath(os.path.join(dirpath, filename), root))
+    return sorted(python_files)
+
+
+def find_test_files(root='.'):
+    """Return all test module paths under root, relative to root."""
+    return [path for path in find_python_files(root) if is_test_file(path)]
+
+
+def module_names(rel_path):
+    """Return the names a module may be imported under, e.g. 'bot.main' and 'main'."""
+    parts = os.path.splitext(rel_path)[0].split(os.sep)
+    if parts[-1] == '__init__' and len(parts) > 1:
+        parts = parts[:-1]
+    return {'.'.join(parts), parts[-1]}
+
+
+def imported_names(rel_path, source):
+    """
+    Return every module name imported by a file.
+
+    `from X import Y` yields both X and X.Y, since Y may be a submodule, and
+    relative imports are resolved against the file's package. Returns None
+    if the file cannot be parsed or a relative import cannot be resolved.
+    """
+    try:
+        tree = ast.parse(source, filename=rel_path)
+    except (SyntaxError, ValueError):
+        return None
+
+    package = os.path.dirname(rel_path).split(os.sep) if os.path.dirname(rel_path) else []
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                if node.level - 1 > len(package):
+                    return None
+                base = package[:len(package) - (node.level - 1)]
+            else:
+                base = []
+            module = '.'.join(base + (node.module.split('.') if node.module else []))
+            if module:
+                names.add(module)
+            for alias in node.names:
+                if alias.name != '*':
+                    names.add(f"{module}.{alias.name}" if module else alias.name)
+    return names
+
+
+def _read_sources(root, paths):
+    sources = {}
+    for path in paths:
+        try:
+            with open(os.path.join(root, path), 'r', encoding='utf-8') as f:
+                sources[path] = f.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+    return sources
+
+
+def affected_tests(changed_paths, root='.'):
+    """
+    Map changed files to the test files that need to run.
+
+    Changed modules are followed through the project's other modules to
+    every module that imports them, directly or indirectly. Returns None
+    when the whole suite should run, otherwise a sorted list of test file
+    paths (possibly empty).
+    """
+    imports = None
+    selected = set()
+
+    for path in changed_paths:
+        rel = os.path.relpath(path, root)
+        if os.path.basename(rel) in GLOBAL_FILES:
+            return None
+        if is_test_file(rel):
+            if os.path.exists(os.path.join(root, rel)):
+                selected.add(rel)
+            continue
+
+        if imports is None:
+            imports = {}
+            for file_path, source in _read_sources(root, find_python_files(root)).items():
+                imports[file_path] = imported_names(file_path, source)
+                # An import we cannot resolve could hide a dependency
+                if imports[file_path] is None:
+                    return None
+
+        # Grow the set of affected modules until no other module imports one of them
+        affected = {rel}
+        names = module_names(rel)
+        while True:
+            importers = {
+                module for module, imported in imports.items()
+                if not is_test_file(module) and module not in affected and imported & names
+            }
+            if not importers:
+                break
+            affected |= importers
+            for module in importers:
+                names |= module_names(module)
+
+        # Fixtures in a conftest can pull the module into any test below it
+        if any(os.path.basename(module) == 'conftest.py' for module in affected):
+            return None
+
+        matched = {
+            module for module, imported in imports.items()
+            if is_test_file(module) and imported & names
+        }
+
+        # A module no test imports, even indirectly, may still be used some other way
+        if not matched:
+            return None
+        selected |= matched
+
+    return sorted(selected)
+
+
+def _run_pytest_in_child(conn, args):
+    """Fork a child from the warm worker, report its pid and run pytest there."""
+    pid = os.fork()
+    if pid == 0:
+        # Own process group, so the watcher can kill the run and anything it spawned
+        os.setpgid(0, 0)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        try:
+            import pytest
+            code = pytest.main(args)
+        except BaseException:
+            code = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(int(code))
+
+    try:
+        os.setpgid(pid, pid)
+    except OSError:
+        pass  # the child already did it, or has exited
+    conn.send(('started', pid))
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def _worker_loop(conn, cwd):
+    """Warm worker: preload heavy imports once, then run each request in a fresh fork."""
+    # Ctrl+C reaches the whole terminal process group; the watcher stops us via stop()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    os.chdir(cwd)
+    if cwd not in sys.path:
+        sys.path.insert(0, cwd)
+
+    for module in WARM_IMPORTS:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+    while True:
+        try:
+            args = conn.recv()
+        except EOFError:
+            break
+        if args is None:
+            break
+        conn.send(('done', _run_pytest_in_child(conn, args)))
+
+
+class WarmWorker:
+    """A long-lived process that keeps pytest and discord.py imported between runs."""
+
+    def __init__(self, cwd='.'):
+        self.cwd = os.path.abspath(cwd)
+        self.process = None
+        self.conn = None
+        self.child_pid = None
+
+    def start(self):
+        # spawn keeps the worker free of the watcher's observer threads
+        ctx = multiprocessing.get_context('spawn')
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_loop, args=(child_conn, self.cwd), daemon=True)
+        self.process.start()
+
+    def run(self, args, timeout=60):
+        """Run pytest with args in the worker and return its exit code."""
+        if self.process is None or not self.process.is_alive():
+            self.stop()
+            self.start()
+        deadline = time.monotonic() + timeout
+        try:
+            self.conn.send(args)
+            while True:
+                if not self.conn.poll(max(0, deadline - time.monotonic())):
+                    self.stop()
+                    raise subprocess.TimeoutExpired(args, timeout)
+                kind, value = self.conn.recv()
+                if kind == 'started':
+                    self.child_pid = value
+                else:
+                    self.child_pid = None
+                    return value
+        except (EOFError, OSError) as e:
+            self.stop()
+            raise RuntimeError("test worker exited unexpectedly") from e
+
+    def kill_child(self):
+        """Kill the pytest run in progress, including any processes it started."""
+        if self.child_pid is None:
+            return
+        try:
+            os.killpg(self.child_pid, signal.SIGKILL)
+        except OSError:
+            pass  # already finished
+        self.child_pid = None
+
+    def stop(self):
+        if self.process is None:
+            self.kill_child()
+            return
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+        # Pick up a run the worker started after we stopped listening
+        try:
+            while self.conn.poll(0):
+                kind, value = self.conn.recv()
+                self.child_pid = value if kind == 'started' else None
+        except (OSError, EOFError):
+            pass
+        self.kill_child()
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
 
 class AutoTestRunner(FileSystemEventHandler):
-    def __init__(self):
-        self.last_test_time = 0
+    def __init__(self, root='.', debounce=DEBOUNCE_SECONDS, worker=None, use_worker=True):
+        self.root = root
+        self.debounce = debounce
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.run_lock = threading.Lock()
+        self.timer = None
+        if worker is None and use_worker and hasattr(os, 'fork'):
+            worker = WarmWorker(root)
+        self.worker = worker
 
-    def run_tests(self):
-        """Run pytest and return True if tests pass."""
+    def run_tests(self, test_files=None):
+        """Run pytest (only test_files if given) and return True if tests pass."""
+        with self.run_lock:
+            result = self._run_pytest(test_files)
+        self._schedule_pending()
+        return result
+
+    def _run_pytest(self, test_files):
+        """Run pytest without taking the run lock; callers must hold it."""
+        args = ['--tb=short', '-q'] + list(test_files or [])
         try:
             print("\n" + "="*50)
-            print("🧪 Running tests...")
+            if test_files:
+                print(f"🧪 Running tests: {', '.join(test_files)}")
+            else:
+                print("🧪 Running tests...")
             print("="*50)
 
-            result = subprocess.run(
-                ['python', '-m', 'pytest', '--tb=short', '-v'],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-
-            print(result.stdout)
-            if result.stderr:
-                print(result.stderr)
+            start = time.perf_counter()
+            if self.worker is not None:
+                returncode = self.worker.run(args)
+            else:
+                returncode = subprocess.run(
+                    [sys.executable, '-m', 'pytest'] + args,
+                    cwd=self.root,
+                    timeout=60
+                ).returncode
+            elapsed = time.perf_counter() - start
 
-            if result.returncode == 0:
-                print("✅ All tests passed!")
+            if returncode == 0:
+                print(f"✅ All tests passed! ({elapsed:.2f}s)")
                 return True
             else:
-                print("❌ Some tests failed!")
+                print(f"❌ Some tests failed! ({elapsed:.2f}s)")
                 return False
 
         except subprocess.TimeoutExpired:
@@ -47,22 +345,94 @@ class AutoTestRunner(FileSystemEventHandler):
             print(f"❌ Error running tests: {e}")
             return False
 
+    def queue_change(self, path):
+        """Record a changed path and (re)start the debounce timer."""
+        with self.lock:
+            self.pending.add(path)
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.debounce, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _schedule_pending(self):
+        """Start the debounce timer for changes that arrived during a run."""
+        with self.lock:
+            if self.pending and self.timer is None:
+                self.timer = threading.Timer(self.debounce, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """Run the tests affected by every change collected since the last run."""
+        with self.lock:
+            if self.timer is not None and self.timer is not threading.current_thread():
+                self.timer.cancel()
+            self.timer = None
+
+        # Only one run at a time; changes stay pending until the current run ends
+        if not self.run_lock.acquire(blocking=False):
+            return None
+        try:
+            with self.lock:
+                changed = self.pending
+                self.pending = set()
+            if not changed:
+                return None
+
+            test_files = affected_tests(changed, self.root)
+            if test_files == []:
+                print("ℹ️  No tests affected by the change")
+                result = True
+            else:
+                result = self._run_pytest(test_files)
+        finally:
+            self.run_lock.release()
+        self._schedule_pending()
+        return result
+
+    def _is_ignored(self, path):
+        parts = os.path.relpath(path, self.root).split(os.sep)
+        return any(part in IGNORED_DIRS for part in parts)
+
+    def _handle(self, path, action='modified'):
+        if self._is_ignored(path):
+            return
+        if path.endswith('.py') or os.path.basename(path) in GLOBAL_FILES:
+            print(f"\n📝 File {action}: {path}")
+            self.queue_change(path)
+
     def on_modified(self, event):
         if event.is_directory:
             return
+        self._handle(event.src_path)
 
-        # Only run tests when Python files are modified
-        if event.src_path.endswith('.py'):
-            print(f"\n📝 File modified: {event.src_path}")
+    def on_created(self, event):
+        if event.is_directory:
+            return
+        self._handle(event.src_path, 'created')
 
-            # Debounce: avoid running tests too frequently
-            current_time = time.time()
-            if current_time - self.last_test_time < 3:  # Wait 3 seconds between test runs
-                return
-            self.last_test_time = current_time
+    def on_deleted(self, event):
+        # Tests importing a deleted module are the ones that will now fail
+        if event.is_directory:
+            return
+        self._handle(event.src_path, 'deleted')
+
+    def on_moved(self, event):
+        # Editors often save by writing a temp file and renaming it over the original;
+        # the old path matters too when a module is renamed away
+        if event.is_directory:
+            return
+        self._handle(event.src_path, 'moved')
+        self._handle(event.dest_path, 'moved')
 
-            # Run tests
-            self.run_tests()
+    def stop(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if self.worker is not None:
+            self.worker.stop()
 
 
 def main():
@@ -87,9 +457,10 @@ def main():
     except KeyboardInterrupt:
         print("\n👋 Stopping test watcher...")
         observer.stop()
+        event_handler.stop()
 
     observer.join()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()